@@ -1,24 +1,37 @@
 # backend/app.py
 import os
+import asyncio
 import zipfile
-import shutil
 import tempfile
 import time
-import glob
 import sys  # ← ADD THIS IMPORT
-from pathlib import Path
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+from zipstream import ZipStream
 
 load_dotenv()
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 if not OPENROUTER_API_KEY:
     print("Warning: OPENROUTER_API_KEY not set in .env (explainer will fail to call LLM).")
 
+TOKENIZER_LOAD_TIMEOUT = 30  # seconds startup waits for the tokenizer
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the tokenizer (may download its BPE file) once, off the event loop;
+    # a slow load keeps going in its thread while token counts are estimated
+    try:
+        await asyncio.wait_for(asyncio.to_thread(load_encoding), TOKENIZER_LOAD_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"⚠️ Tokenizer not loaded after {TOKENIZER_LOAD_TIMEOUT}s; estimating tokens until it is")
+    yield
+
 # allow front-end dev origin
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # allow all origins
@@ -30,114 +43,171 @@ app.add_middleware(
 
 
 # import your explainer (make sure explainer.py is next to this file)
-from explainer import process_folder, OUTPUT_DIR  # explainer.py must define these
+from explainer import process_entries, load_encoding, OUTPUT_DIR, MAX_FILE_BYTES  # explainer.py must define these
 
 ALLOWED_EXTENSIONS = {".py", ".js", ".html", ".css", ".ts", ".jsx", ".java", ".cpp"}
 EXCLUDE_DIRS = {"node_modules", ".git", "dist", "build", "__pycache__"}
+_EXT_TUPLE = tuple(ALLOWED_EXTENSIONS)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Result files live in the OS temp dir (often tmpfs); the most recent ones are
+# tracked in-process and the oldest is deleted once the cap is reached
+RESULT_DIR = tempfile.gettempdir()
+MAX_RECENT_RESULTS = 50
+_recent_results = OrderedDict()  # path -> creation time
+# zip-bomb guards on uncompressed sizes
+MAX_ENTRY_BYTES = 5 * 1024 * 1024   # per allowed file
+MAX_TOTAL_BYTES = 50 * 1024 * 1024  # across all files read from one upload
 
-def cleanup_old_temp_zips(zip_dir, max_age_hours=1):
-    """Remove temporary zip files older than max_age_hours"""
-    current_time = time.time()
-    for zip_file in glob.glob(os.path.join(zip_dir, "result_bundle_*.zip")):
+def remember_result(path):
+    """Track a served result file, evicting (deleting) the oldest over MAX_RECENT_RESULTS."""
+    _recent_results[path] = time.time()
+    _recent_results.move_to_end(path)
+    while len(_recent_results) > MAX_RECENT_RESULTS:
+        old_path, _ = _recent_results.popitem(last=False)
         try:
-            file_age = current_time - os.path.getctime(zip_file)
-            if file_age > max_age_hours * 3600:  # Convert hours to seconds
-                os.remove(zip_file)
-                print(f"🧹 Cleaned up old temp file: {zip_file}")
-        except Exception as e:
-            print(f"⚠️ Could not clean up {zip_file}: {e}")
+            os.remove(old_path)
+        except OSError as e:
+            print(f"⚠️ Could not clean up {old_path}: {e}")
+
+def iter_allowed_members(z, skip_over=None):
+    """Yield (info, path_parts) for allowed zip entries, in scan_allowed_files order.
+
+    Per directory, files come first (sorted by name), then subdirectories, so
+    the max_files cut and numbering match the CLI.
+    Entries larger than skip_over bytes are skipped silently; any other entry
+    over MAX_ENTRY_BYTES is one the caller would read, so it raises 413.
+    """
+    members = [
+        (info, info.filename.replace("\\", "/").split("/"))
+        for info in z.infolist()
+        if not info.is_dir()
+    ]
+    members.sort(key=lambda m: tuple((1, p) for p in m[1][:-1]) + ((0, m[1][-1]),))
+    for info, parts in members:
+        # skip unsafe paths (absolute / parent traversal) and excluded dirs
+        if info.filename.startswith("/") or ".." in parts:
+            continue
+        if any(p in EXCLUDE_DIRS for p in parts[:-1]):
+            continue
+        if not parts[-1].lower().endswith(_EXT_TUPLE):
+            continue
+        if skip_over is not None and info.file_size > skip_over:
+            continue
+        if info.file_size > MAX_ENTRY_BYTES:
+            raise HTTPException(status_code=413, detail=f"{info.filename} exceeds {MAX_ENTRY_BYTES} bytes uncompressed")
+        yield info, parts
 
-def collect_allowed_files(root_dir, max_files=20):
-    """Return list of file paths (absolute) limited to max_files."""
+def check_total_size(total_bytes):
+    """Reject the upload once the uncompressed bytes read pass MAX_TOTAL_BYTES."""
+    if total_bytes > MAX_TOTAL_BYTES:
+        raise HTTPException(status_code=413, detail=f"Zip contents exceed {MAX_TOTAL_BYTES} bytes uncompressed")
+
+def extract_allowed_files(zip_path, dest_dir, max_files=20):
+    """Extract only allowed files from the zip into dest_dir, in a single pass.
+
+    Returns the list of extracted file paths (absolute), limited to max_files.
+    Raises HTTPException(413) if an entry or the running total is too large.
+    """
     files = []
-    for root, dirs, filenames in os.walk(root_dir):
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        for f in sorted(filenames):
-            ext = os.path.splitext(f)[1].lower()
-            if ext in ALLOWED_EXTENSIONS:
-                files.append(os.path.join(root, f))
-                if len(files) >= max_files:
-                    return files
+    total_bytes = 0
+    with zipfile.ZipFile(zip_path, "r") as z:
+        for info, parts in iter_allowed_members(z):
+            dst = os.path.join(dest_dir, *parts)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            with z.open(info) as src, open(dst, "wb") as out:
+                # count real bytes, not the declared size, while streaming out
+                while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                    total_bytes += len(chunk)
+                    check_total_size(total_bytes)
+                    out.write(chunk)
+            files.append(dst)
+            if len(files) >= max_files:
+                break
     return files
 
+def read_allowed_entries(zip_path, max_files=20):
+    """Read allowed files straight from the zip as (rel_path, ext, code) entries.
+
+    Nothing is written to disk; entries over MAX_FILE_BYTES are skipped.
+    """
+    entries = []
+    total_bytes = 0
+    with zipfile.ZipFile(zip_path, "r") as z:
+        for info, parts in iter_allowed_members(z, skip_over=MAX_FILE_BYTES):
+            rel_path = "/".join(parts)
+            ext = os.path.splitext(rel_path)[1].lower()
+            data = z.read(info)
+            total_bytes += len(data)
+            check_total_size(total_bytes)
+            code = data.decode("utf-8", errors="ignore")
+            entries.append((rel_path, ext, code))
+            if len(entries) >= max_files:
+                break
+    return entries
+
 @app.post("/upload")
 async def upload_project(file: UploadFile = File(...), max_files: int = 20):
     # Basic validation
     if not file.filename.endswith(".zip"):
         raise HTTPException(status_code=400, detail="Only .zip uploads allowed")
 
-    # Create a persistent directory for the result zip
-    result_zip_dir = os.path.join(OUTPUT_DIR, "temp_zips")
-    os.makedirs(result_zip_dir, exist_ok=True)
-    
-    # Clean up old temp files first
-    cleanup_old_temp_zips(result_zip_dir)
-    
-    # Create unique zip filename
     timestamp = int(time.time())
-    result_zip = os.path.join(result_zip_dir, f"result_bundle_{timestamp}.zip")
 
-    # Use temporary directory only for extraction
+    # Use temporary directory only for the uploaded zip
     with tempfile.TemporaryDirectory() as tmpdir:
         upload_path = os.path.join(tmpdir, "upload.zip")
         with open(upload_path, "wb") as f:
-            contents = await file.read()
-            f.write(contents)
-
-        extract_dir = os.path.join(tmpdir, "extracted")
-        os.makedirs(extract_dir, exist_ok=True)
-        with zipfile.ZipFile(upload_path, "r") as z:
-            z.extractall(extract_dir)
+            # Stream in 1 MiB chunks so peak memory does not grow with upload size
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                f.write(chunk)
 
-        # collect allowed files (limit)
-        selected = collect_allowed_files(extract_dir, max_files=max_files)
+        # read allowed files (limit) straight out of the zip; nothing is staged on disk
+        entries = await asyncio.to_thread(read_allowed_entries, upload_path, max_files=max_files)
 
-        if not selected:
+        if not entries:
             raise HTTPException(status_code=400, detail="No allowed files found in zip")
 
-        # create a clean temp dir with only selected files (preserve relative structure)
-        selected_dir = os.path.join(tmpdir, "selected_project")
-        for src in selected:
-            rel = os.path.relpath(src, extract_dir)
-            dst = os.path.join(selected_dir, rel)
-            os.makedirs(os.path.dirname(dst), exist_ok=True)
-            shutil.copy2(src, dst)
-
-        # Clear OUTPUT_DIR before processing (optional). OUTPUT_DIR is from explainer.py
-        if os.path.exists(OUTPUT_DIR):
-            try:
-                # remove old output files only (careful!)
-                for f in Path(OUTPUT_DIR).glob("*"):
-                    if f.is_file() and not f.name.startswith('temp_zips'):
-                        f.unlink()
-            except Exception as e:
-                print("Could not clear old outputs:", e)
-
-        # Run your existing processing code (this writes PDFs into OUTPUT_DIR)
-        process_folder(selected_dir)
-
-        # Check if PDFs were created successfully
-        pdf_files = [f for f in os.listdir(OUTPUT_DIR) if f.endswith('.pdf')]
-        if not pdf_files:
-            raise HTTPException(status_code=500, detail="Processing failed; no PDFs were generated")
-
-        # Package generated outputs into one zip to return
-        with zipfile.ZipFile(result_zip, "w", zipfile.ZIP_DEFLATED) as z:
-            for root, _, files in os.walk(OUTPUT_DIR):
-                for fname in files:
-                    if fname.endswith('.pdf'):  # Only include PDF files
-                        fpath = os.path.join(root, fname)
-                        arcname = fname  # Just the filename, not the full path
-                        z.write(fpath, arcname=arcname)
-
-        if not os.path.exists(result_zip):
-            raise HTTPException(status_code=500, detail="Processing failed; no outputs produced")
-
-    # Return the zip file from a persistent location
-    return FileResponse(
-        result_zip, 
-        media_type="application/zip", 
-        filename=f"code_documentation_{timestamp}.zip"
+    # Zip each PDF into the response as soon as process_entries finishes it
+    pdfs = process_entries(entries)
+    try:
+        # Wait for the first PDF so an early failure still returns a 500; later
+        # failures are reported in errors.txt inside the streamed zip
+        first_pdf = await pdfs.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=500, detail="Processing failed; no PDFs were generated")
+    except Exception as e:
+        print(f"❌ Processing failed: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+
+    async def stream_zip():
+        # PDFs are already compressed; storing them keeps deflate off the event loop
+        zs = ZipStream(compress_type=zipfile.ZIP_STORED)
+        zs.add(first_pdf[1], arcname=first_pdf[0])
+        for chunk in zs.all_files():
+            yield chunk
+        try:
+            async for name, pdf in pdfs:
+                zs.add(pdf, arcname=name)
+                for chunk in zs.all_files():
+                    yield chunk
+        except Exception as e:
+            # Headers are already sent, so report the failure inside the archive
+            print(f"❌ Processing failed after streaming started: {e}")
+            import traceback
+            traceback.print_exc()
+            zs.add(f"Some PDFs could not be generated: {e}\n".encode("utf-8"), arcname="errors.txt")
+            for chunk in zs.all_files():
+                yield chunk
+        # Always finish the archive so the download stays a valid zip
+        for chunk in zs.footer():
+            yield chunk
+
+    return StreamingResponse(
+        stream_zip(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="code_documentation_{timestamp}.zip"'}
     )
 
 @app.get("/health")
@@ -150,33 +220,39 @@ async def generate_report_endpoint(file: UploadFile = File(...), max_files: int
     if not file.filename.endswith(".zip"):
         raise HTTPException(status_code=400, detail="Only .zip uploads allowed")
 
-    # Create persistent directory for the report
-    result_pdf_dir = os.path.join(OUTPUT_DIR, "temp_reports")
-    os.makedirs(result_pdf_dir, exist_ok=True)
-    result_pdf = os.path.join(result_pdf_dir, f"project_analysis_report_{int(time.time())}.pdf")
+    # Reserve a unique report path in the temp dir; once the report is written it
+    # stays until evicted by remember_result, on failure it is removed right away
+    fd, result_pdf = tempfile.mkstemp(prefix="project_analysis_report_", suffix=".pdf", dir=RESULT_DIR)
+    os.close(fd)
+    try:
+        await build_report(file, result_pdf, max_files)
+    except BaseException:
+        os.remove(result_pdf)
+        raise
+    remember_result(result_pdf)
+
+    return FileResponse(
+        result_pdf,
+        media_type="application/pdf",
+        filename="project_analysis_report.pdf"
+    )
 
+async def build_report(file, result_pdf, max_files):
+    """Read the uploaded zip and write its analysis report to result_pdf."""
     with tempfile.TemporaryDirectory() as tmpdir:
         upload_path = os.path.join(tmpdir, "upload.zip")
         with open(upload_path, "wb") as f:
-            contents = await file.read()
-            f.write(contents)
-
-        extract_dir = os.path.join(tmpdir, "extracted")
-        os.makedirs(extract_dir, exist_ok=True)
-        with zipfile.ZipFile(upload_path, "r") as z:
-            z.extractall(extract_dir)
+            # Stream in 1 MiB chunks so peak memory does not grow with upload size
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                f.write(chunk)
 
-        selected = collect_allowed_files(extract_dir, max_files=max_files)
+        selected_dir = os.path.join(tmpdir, "selected_project")
+        selected = await asyncio.to_thread(
+            extract_allowed_files, upload_path, selected_dir, max_files=max_files
+        )
         if not selected:
             raise HTTPException(status_code=400, detail="No allowed files found in zip")
 
-        selected_dir = os.path.join(tmpdir, "selected_project")
-        for src in selected:
-            rel = os.path.relpath(src, extract_dir)
-            dst = os.path.join(selected_dir, rel)
-            os.makedirs(os.path.dirname(dst), exist_ok=True)
-            shutil.copy2(src, dst)
-
         # Generate the analysis report
         try:
             # Add current directory to Python path
@@ -184,19 +260,11 @@ async def generate_report_endpoint(file: UploadFile = File(...), max_files: int
             from report import generate_report
             
             print("📊 Starting analysis report generation...")
-            report_path = generate_report(selected_dir)
-            
-            # Move the generated report to persistent storage
-            if os.path.exists(report_path):
-                shutil.move(report_path, result_pdf)
-            
-            if os.path.exists(result_pdf):
-                return FileResponse(
-                    result_pdf,
-                    media_type="application/pdf",
-                    filename="project_analysis_report.pdf"
-                )
-            else:
+            # Analysis runs in a thread (it needs selected_dir); the PDF is then
+            # built straight into the reserved path by report's process pool
+            pdf_future = await asyncio.to_thread(generate_report, selected_dir, result_pdf)
+            await asyncio.wrap_future(pdf_future)
+            if os.path.getsize(result_pdf) == 0:
                 raise HTTPException(status_code=500, detail="Report PDF was not created")
             
         except ImportError as e:
@@ -208,35 +276,6 @@ async def generate_report_endpoint(file: UploadFile = File(...), max_files: int
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
 
-# Add cleanup function for report files
-def cleanup_old_temp_reports(report_dir, max_age_hours=1):
-    """Remove temporary report files older than max_age_hours"""
-    current_time = time.time()
-    for report_file in glob.glob(os.path.join(report_dir, "project_analysis_report_*.pdf")):
-        try:
-            file_age = current_time - os.path.getctime(report_file)
-            if file_age > max_age_hours * 3600:
-                os.remove(report_file)
-                print(f"🧹 Cleaned up old report: {report_file}")
-        except Exception as e:
-            print(f"⚠️ Could not clean up {report_file}: {e}")
-
-# Update startup event to clean both zip and report files
-@app.on_event("startup")
-async def startup_event():
-    """Clean up old temp files on startup"""
-    # Clean zip files
-    result_zip_dir = os.path.join(OUTPUT_DIR, "temp_zips")
-    os.makedirs(result_zip_dir, exist_ok=True)
-    cleanup_old_temp_zips(result_zip_dir)
-    
-    # Clean report files
-    result_pdf_dir = os.path.join(OUTPUT_DIR, "temp_reports")
-    os.makedirs(result_pdf_dir, exist_ok=True)
-    cleanup_old_temp_reports(result_pdf_dir)
-    
-    print("✅ Server started and temp files cleaned up")
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,13 +1,25 @@
 import os
 import sys
 import re
-import requests
-import pypandoc
-from dotenv import load_dotenv
+import asyncio
+import hashlib
+import threading
 import time
+import httpx
+import tiktoken
+from diskcache import Cache
+from markdown_it import MarkdownIt
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+from weasyprint import HTML, CSS
+from weasyprint.text.fonts import FontConfiguration
+from dotenv import load_dotenv
 import random
 import json
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Iterable, Iterator, List, Tuple
 
 # === Load environment variables ===
 load_dotenv()
@@ -19,16 +31,169 @@ FREE_MODELS = [
     "mistralai/mistral-7b-instruct:free"
 ]
 
+# Shared keep-alive HTTP/2 client (one TLS handshake, multiplexed batches)
+# and a cap on in-flight LLM requests (provider rate limits)
+LLM_CONCURRENCY = 4
+_client = httpx.AsyncClient(
+    http2=True,
+    timeout=45,
+    limits=httpx.Limits(max_keepalive_connections=8),
+)
+_llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "../output")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-ALLOWED_EXTENSIONS = {".py", ".js", ".html", ".css", ".ts", ".jsx", ".java", ".cpp"}
+# Persistent explanation cache, so re-uploads of unchanged files skip the LLM
+_llm_cache = Cache(os.path.join(OUTPUT_DIR, "llm_cache"))
+
+ALLOWED_EXTENSIONS = frozenset({".py", ".js", ".html", ".css", ".ts", ".jsx", ".java", ".cpp"})
 EXCLUDE_DIRS = {"node_modules", ".git", "dist", "build", "__pycache__"}
+MAX_FILE_BYTES = 30_000  # larger files are skipped
+_EXT_TUPLE = tuple(ALLOWED_EXTENSIONS)
+
+# Token budgets for LLM prompts (cl100k_base is close enough for the free models)
+MAX_INPUT_TOKENS = 2000     # whole batch prompt
+MAX_FILE_TOKENS = 200       # code snippet per file in a batch
+MAX_BATCH_FILES = 8         # keeps the numbered reply within max_tokens
+FILE_PROMPT_OVERHEAD = 10   # numbering, fences and newlines per file
+EXPLANATION_TOKENS = 500    # code snippet for get_explanation
+CHARS_PER_TOKEN = 4         # estimate used when the tokenizer is unavailable
+ENCODING_RETRY_SECONDS = 300  # wait before retrying a failed tokenizer load
+BATCH_PROMPT_HEADER = "Explain each code snippet in exactly 10 words:\n\n"
+BATCH_PROMPT_FOOTER = "Provide explanations as a numbered list, each exactly 10 words:"
+
+_NUM_RE = re.compile(r'^\d+[\.\)]\s*')
+
+# Markdown -> HTML renderer; fenced code blocks are highlighted with pygments
+_HIGHLIGHT_FORMATTER = HtmlFormatter(style="default", nowrap=True)
+
+def highlight_code(code: str, lang: str, attrs: str) -> str:
+    """markdown-it highlight hook; empty string falls back to escaped plain text."""
+    try:
+        lexer = get_lexer_by_name(lang)
+    except ClassNotFound:
+        return ""
+    return highlight(code, lexer, _HIGHLIGHT_FORMATTER)
+
+_markdown = MarkdownIt("commonmark", {"highlight": highlight_code}).enable("table")
+
+# PDF styling, parsed once per process and shared by every document
+PDF_STYLE = """
+    body {
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+        line-height: 1.6;
+        margin: 40px;
+        color: #333;
+        background-color: #fff;
+    }
+
+    h1, h2, h3, h4 {
+        color: #2c3e50;
+        border-bottom: 2px solid #ecf0f1;
+        padding-bottom: 10px;
+        margin-top: 30px;
+    }
+
+    pre {
+        background-color: #f8f9fa;
+        padding: 15px;
+        border-radius: 5px;
+        border-left: 4px solid #3498db;
+        overflow-x: auto;
+        margin: 20px 0;
+        font-size: 14px;
+    }
+
+    code {
+        font-family: 'Fira Code', 'Consolas', 'Monaco', monospace;
+        background-color: #f8f9fa;
+        padding: 2px 5px;
+        border-radius: 3px;
+        color: #e74c3c;
+    }
+
+    pre code {
+        background: none;
+        padding: 0;
+        color: inherit;
+    }
+
+    .filename {
+        background-color: #34495e;
+        color: white;
+        padding: 8px 15px;
+        border-radius: 5px 5px 0 0;
+        font-family: monospace;
+        font-weight: bold;
+        margin-bottom: -5px;
+    }
+"""
+_FONT_CONFIG = FontConfiguration()
+_PDF_CSS = CSS(
+    string=PDF_STYLE + _HIGHLIGHT_FORMATTER.get_style_defs("pre code"),
+    font_config=_FONT_CONFIG,
+)
+
+# Tokenizer, loaded once off the event loop (see load_encoding)
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_retry_at = 0.0
+
+# WeasyPrint is CPU-bound, so PDFs are rendered in worker processes (also keeps
+# the event loop free); one pool is shared by every upload
+_RENDER_POOL = ProcessPoolExecutor(max_workers=3)
 
 def safe_path(path: str) -> str:
     """Make file paths safe for Markdown/PDF conversion."""
     return path.replace("\\", "/")
 
+def load_encoding():
+    """Load the tokenizer if it is not loaded yet; returns it, or None if it cannot be loaded.
+
+    tiktoken fetches the BPE file once (unless TIKTOKEN_CACHE_DIR already holds
+    it) with no timeout, so only call this off the event loop. A failure is
+    retried after ENCODING_RETRY_SECONDS rather than remembered for good.
+    """
+    global _encoding, _encoding_retry_at
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                _encoding_retry_at = time.monotonic() + ENCODING_RETRY_SECONDS
+                print(f"⚠️ Could not load tokenizer, estimating tokens from characters: {e}")
+        return _encoding
+
+def get_encoding():
+    """The loaded tokenizer, or None (token counts are then estimated); never blocks.
+
+    While it is missing and no load is running, a retry is started in a
+    background thread once ENCODING_RETRY_SECONDS have passed since the last failure.
+    """
+    global _encoding_retry_at
+    if _encoding is None and not _encoding_lock.locked() and time.monotonic() >= _encoding_retry_at:
+        _encoding_retry_at = time.monotonic() + ENCODING_RETRY_SECONDS
+        threading.Thread(target=load_encoding, name="load-tokenizer", daemon=True).start()
+    return _encoding
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)  # round up so budgets stay conservative
+    return len(encoding.encode(text, disallowed_special=()))
+
+def trim_to_tokens(text: str, max_tokens: int) -> Tuple[str, int]:
+    """Trim text to at most max_tokens tokens; returns (text, token_count)."""
+    encoding = get_encoding()
+    if encoding is None:
+        text = text[:max_tokens * CHARS_PER_TOKEN]
+        return text, count_tokens(text)
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text, len(tokens)
+    return encoding.decode(tokens[:max_tokens]), max_tokens
+
 def read_code(file_path):
     try:
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
@@ -37,104 +202,33 @@ def read_code(file_path):
         print(f"⚠️ Error reading {file_path}: {e}")
         return ""
 
-def save_pdf_from_markdown(markdown_text, output_path):
-    """Convert markdown to PDF using WeasyPrint (beautiful output)."""
+def read_codes(file_paths: List[str], max_workers: int = 8) -> List[str]:
+    """Read many files concurrently (overlaps per-file open/read latency)."""
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        return list(ex.map(read_code, file_paths))
+
+def render_pdf(markdown_text: str) -> bytes:
+    """Convert markdown to PDF bytes using WeasyPrint (beautiful output)."""
     try:
-        # First convert markdown to HTML using pandoc with syntax highlighting
-        html_content = pypandoc.convert_text(
-            markdown_text,
-            'html',
-            format='md',
-            extra_args=['--highlight-style=pygments']
-        )
+        # First convert markdown to HTML in-process, with pygments syntax highlighting
+        html_content = _markdown.render(markdown_text)
         
-        # Add beautiful CSS styling
-        styled_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                body {{
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    line-height: 1.6;
-                    margin: 40px;
-                    color: #333;
-                    background-color: #fff;
-                }}
-                
-                h1, h2, h3, h4 {{
-                    color: #2c3e50;
-                    border-bottom: 2px solid #ecf0f1;
-                    padding-bottom: 10px;
-                    margin-top: 30px;
-                }}
-                
-                pre {{
-                    background-color: #f8f9fa;
-                    padding: 15px;
-                    border-radius: 5px;
-                    border-left: 4px solid #3498db;
-                    overflow-x: auto;
-                    margin: 20px 0;
-                    font-size: 14px;
-                }}
-                
-                code {{
-                    font-family: 'Fira Code', 'Consolas', 'Monaco', monospace;
-                    background-color: #f8f9fa;
-                    padding: 2px 5px;
-                    border-radius: 3px;
-                    color: #e74c3c;
-                }}
-                
-                pre code {{
-                    background: none;
-                    padding: 0;
-                    color: inherit;
-                }}
-                
-                .filename {{
-                    background-color: #34495e;
-                    color: white;
-                    padding: 8px 15px;
-                    border-radius: 5px 5px 0 0;
-                    font-family: monospace;
-                    font-weight: bold;
-                    margin-bottom: -5px;
-                }}
-            </style>
-        </head>
-        <body>
-            {html_content}
-        </body>
-        </html>
-        """
+        # Only the body is built per document; the stylesheet is pre-parsed
+        html = f'<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>{html_content}</body></html>'
         
         # Convert HTML to PDF using WeasyPrint
-        from weasyprint import HTML
-        HTML(string=styled_html).write_pdf(output_path)
-        print(f"✅ Beautiful PDF saved: {output_path}")
+        return HTML(string=html).write_pdf(stylesheets=[_PDF_CSS], font_config=_FONT_CONFIG)
         
     except Exception as e:
         print(f"❌ Error with WeasyPrint: {e}")
-        # Fallback to simple method if WeasyPrint fails
-        try:
-            pypandoc.convert_text(
-                markdown_text,  # Use original text without escaping
-                'pdf',
-                format='md',
-                outputfile=output_path,
-                extra_args=['--pdf-engine=xelatex', '--standalone']
-            )
-            print(f"✅ PDF saved with fallback method: {output_path}")
-        except Exception as fallback_error:
-            print(f"❌ All methods failed: {fallback_error}")
-            raise
-
-
-def call_llm(prompt: str, model_index: int = 0, retries: int = 3) -> str:
-    """Smart LLM calling with model rotation and intelligent backoff."""
+        raise
+
+async def call_llm(prompt: str, model_index: int = 0, retries: int = 3) -> Tuple[str, str]:
+    """Smart LLM calling with model rotation and intelligent backoff.
+
+    Returns (content, model), where model is the one that actually answered
+    (or was last tried, for error messages).
+    """
     url = "https://openrouter.ai/api/v1/chat/completions"
     
     # Rotate through free models
@@ -151,7 +245,7 @@ def call_llm(prompt: str, model_index: int = 0, retries: int = 3) -> str:
         "model": current_model,
         "messages": [
             {"role": "system", "content": "You are a helpful programming tutor. Be concise."},
-            {"role": "user", "content": prompt[:8000]}  # Limit prompt size
+            {"role": "user", "content": prompt}  # callers budget prompts in tokens
         ],
         "max_tokens": 300,  # Limit response length
         "temperature": 0.3   # More deterministic responses
@@ -159,62 +253,110 @@ def call_llm(prompt: str, model_index: int = 0, retries: int = 3) -> str:
 
     for attempt in range(retries):
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=45)
+            async with _llm_semaphore:
+                resp = await _client.post(url, headers=headers, json=payload)
             
             if resp.status_code == 429:
                 # Intelligent backoff: longer waits for repeated rate limits
                 wait_time = min(120, (2 ** attempt) * 5 + random.uniform(0, 5))
                 print(f"⚠️ Rate limit on {current_model}. Retrying in {wait_time:.1f}s...")
-                time.sleep(wait_time)
+                await asyncio.sleep(wait_time)
                 # Try next model on rate limit
-                return call_llm(prompt, model_index + 1, retries - 1)
+                return await call_llm(prompt, model_index + 1, retries - 1)
                 
             resp.raise_for_status()
-            response_text = resp.json()["choices"][0]["message"]["content"]
-            return response_text.encode('ascii', errors='ignore').decode('ascii')
+            return resp.json()["choices"][0]["message"]["content"], current_model
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             if attempt == retries - 1:
                 print(f"❌ Final failure on {current_model}: {e}")
-                return f"⚠️ Could not generate explanation due to API error: {e}"
+                return f"⚠️ Could not generate explanation due to API error: {e}", current_model
             
             wait_time = (2 ** attempt) + random.uniform(0, 3)
             print(f"⚠️ Error on {current_model}: {e}. Retrying in {wait_time:.1f}s...")
-            time.sleep(wait_time)
+            await asyncio.sleep(wait_time)
     
-    return "⚠️ Explanation unavailable due to API issues"
-def get_explanation(code: str, filename: str) -> str:
+    return "⚠️ Explanation unavailable due to API issues", current_model
+async def get_explanation(code: str, filename: str) -> str:
     """Get ultra-concise explanation of a code file."""
+    snippet, _ = await asyncio.to_thread(trim_to_tokens, code, EXPLANATION_TOKENS)
     prompt = (
         f"You are a senior coding tutor. Summarize the purpose and flow of {filename} "
         f"in **5–8 clear bullet points** (avoid repeating code).\n\n"
-        f"Code snippet:\n```python\n{code[:2000]}\n```\n"
+        f"Code snippet:\n```python\n{snippet}\n```\n"
         "Answer:"
     )
-    return call_llm(prompt)
+    explanation, _ = await call_llm(prompt)
+    return explanation
+
+
+def content_digest(code: str) -> str:
+    """Short content hash used for explanation caching and duplicate detection."""
+    return hashlib.blake2b(code.encode("utf-8"), digest_size=16).hexdigest()
+
+def explanation_cache_key(digest: str, model: str) -> str:
+    """Cache key for a file's explanation: content hash + the model that wrote it."""
+    return f"{model}:{digest}"
+
+def cached_explanation(digest: str):
+    """Cached explanation for digest from any model (primary first), or None."""
+    for model in FREE_MODELS:
+        explanation = _llm_cache.get(explanation_cache_key(digest, model))
+        if explanation is not None:
+            return explanation
+    return None
+
+async def generate_batch_explanations(file_batch: List[Tuple[str, str, str, str]]) -> List[str]:
+    """Process multiple (filename, code, ext, digest) files in one API call; cached files are not re-sent.
 
+    Code is expected to be pre-trimmed (see trim_to_tokens) and digest is the
+    content_digest of the full file, which keys the cache. Duplicate files are
+    dropped beforehand (see plan_batches), so every file here is distinct.
+    """
+    explanations = [cached_explanation(digest) for _, _, _, digest in file_batch]
+    uncached = [i for i, explanation in enumerate(explanations) if explanation is None]
 
-def generate_batch_explanations(file_batch: List[Tuple[str, str, str]]) -> List[str]:
-    """Process multiple files in one API call."""
-    batch_prompt = "Explain each code snippet in exactly 10 words:\n\n"
+    if not uncached:
+        return explanations
+
+    batch_prompt = BATCH_PROMPT_HEADER
     
-    for i, (filename, code, ext) in enumerate(file_batch):
-        batch_prompt += f"{i+1}. {filename} ({ext}):\n```{ext}\n{code[:500]}\n```\n\n"
+    for n, i in enumerate(uncached):
+        filename, code, ext, _ = file_batch[i]
+        batch_prompt += f"{n+1}. {filename} ({ext}):\n```{ext}\n{code}\n```\n\n"
     
-    batch_prompt += "Provide explanations as a numbered list, each exactly 10 words:"
+    batch_prompt += BATCH_PROMPT_FOOTER
     
-    response = call_llm(batch_prompt)
-    return parse_batch_response(response, len(file_batch))
+    response, model = await call_llm(batch_prompt)
+    parsed = parse_numbered_lines(response)
+    if len(parsed) == len(uncached):
+        # Only real answers are cached (under the model that gave them),
+        # never fallbacks or API errors
+        for i, explanation in zip(uncached, parsed):
+            _llm_cache.set(explanation_cache_key(file_batch[i][3], model), explanation)
+    else:
+        parsed = parse_batch_response(response, len(uncached))
 
-def parse_batch_response(response: str, expected_count: int) -> List[str]:
-    """Parse batch response into individual explanations."""
+    for i, explanation in zip(uncached, parsed):
+        explanations[i] = explanation
+    return explanations
+
+def parse_numbered_lines(response: str) -> List[str]:
+    """Return the text of every numbered line ("1. ..." / "1) ...") in response."""
     explanations = []
     lines = response.split('\n')
     
     for line in lines:
-        if re.match(r'^\d+[\.\)]', line.strip()):
-            explanation = re.sub(r'^\d+[\.\)]\s*', '', line.strip())
-            explanations.append(explanation)
+        line = line.strip()
+        match = _NUM_RE.match(line)
+        if match:
+            explanations.append(line[match.end():])
+    
+    return explanations
+
+def parse_batch_response(response: str, expected_count: int) -> List[str]:
+    """Parse batch response into individual explanations."""
+    explanations = parse_numbered_lines(response)
     
     # If parsing failed, return generic explanations
     if len(explanations) != expected_count:
@@ -222,84 +364,195 @@ def parse_batch_response(response: str, expected_count: int) -> List[str]:
     
     return explanations
 
-def process_folder(folder_path: str):
-    """Process folder with smart batching and rate limiting."""
-    code_md = "# Project Code\n\n"
-    explanation_md = "# Project Explanations\n\n"
+def scan_allowed_files(root_dir: str) -> Iterator[os.DirEntry]:
+    """Yield allowed files under root_dir (files sorted, before subdirectories).
+
+    Uses os.scandir so file/dir type comes from the directory listing, not extra stats.
+    """
+    with os.scandir(root_dir) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name not in EXCLUDE_DIRS:
+                subdirs.append(entry)
+        elif entry.name.lower().endswith(_EXT_TUPLE) and entry.is_file():
+            yield entry
+    for entry in subdirs:
+        yield from scan_allowed_files(entry.path)
+
+async def process_folder(folder_path: str):
+    """Process a folder on disk: collect allowed files and hand them to process_entries."""
+    file_paths = []
+    rel_paths = []
     
-    # Collect all files first
-    all_files = []
-    counter = 1
+    for entry in scan_allowed_files(folder_path):
+        if entry.stat().st_size <= MAX_FILE_BYTES:
+            file_paths.append(entry.path)
+            rel_paths.append(os.path.relpath(entry.path, folder_path))
+
+    codes = await asyncio.to_thread(read_codes, file_paths)
+    entries = [
+        (rel_path, os.path.splitext(rel_path)[1].lower(), code)
+        for rel_path, code in zip(rel_paths, codes)
+    ]
+
+    clear_old_outputs()
+    async for name, pdf in process_entries(entries):
+        output_path = os.path.join(OUTPUT_DIR, name)
+        with open(output_path, "wb") as f:
+            f.write(pdf)
+        print(f"✅ PDF saved: {output_path}")
+    print("✅ All done! PDFs saved in output folder")
+
+def clear_old_outputs():
+    """Remove old output files (not directories, nothing prefixed temp_) from OUTPUT_DIR."""
+    try:
+        # scandir's cached entry type avoids a stat per file; remove old output files only (careful!)
+        with os.scandir(OUTPUT_DIR) as it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False) and not entry.name.startswith("temp_"):
+                    os.unlink(entry.path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print("Could not clear old outputs:", e)
+
+async def process_entries(entries: Iterable[Tuple[str, str, str]]) -> AsyncIterator[Tuple[str, bytes]]:
+    """Process (rel_path, ext, code) entries; no filesystem staging needed.
+
+    Async generator yielding (filename, pdf_bytes) as each PDF is finished.
+    The LLM work starts straight away and runs while code_only.pdf (which
+    needs no LLM) is rendered and handed out first; the explanation and quiz
+    PDFs follow.
+    """
+    entries = list(entries)
+
+    loop = asyncio.get_running_loop()
+    explained = render_explanations_and_quiz(entries, _RENDER_POOL)
+    # Drive the slow, LLM-bound pipeline up to its first PDF in the background
+    first_explained = asyncio.create_task(explained.__anext__())
+    try:
+        yield "code_only.pdf", await loop.run_in_executor(_RENDER_POOL, render_code_pdf, entries)
+        yield await first_explained
+        async for name, pdf in explained:
+            yield name, pdf
+    finally:
+        first_explained.cancel()
+
+def number_entries(entries: Iterable[Tuple[str, str, str]]) -> List[Tuple[str, str, str, int]]:
+    """Attach the 1-based counter used in every PDF's headings: (rel_path, ext, code, counter)."""
+    return [
+        (rel_path, ext, code, counter)
+        for counter, (rel_path, ext, code) in enumerate(entries, start=1)
+    ]
+
+def render_code_pdf(entries: Iterable[Tuple[str, str, str]]) -> bytes:
+    """Render the code-only PDF; pure source text, no network."""
+    # Markdown is built as lists of parts and joined once (no quadratic +=)
+    code_parts = ["# Project Code\n\n"]
+    for rel_path, ext, code, counter in number_entries(entries):
+        if code:
+            code_parts.append(f"## {counter}. {safe_path(rel_path)}\n```{ext[1:]}\n{code}\n```\n\n")
+    return render_pdf("".join(code_parts))
+
+def plan_batches(all_files: List[Tuple[str, str, str, int]]):
+    """Pack numbered files into LLM batches by token budget (prompt size), not a fixed file count.
+
+    Tokenizing is CPU work, so this runs in a worker thread. Returns
+    (explained, duplicates, batches): indices of files with code in file order,
+    duplicate index -> index of the identical file that is sent instead, and
+    (batch_indices, batch_data) pairs.
+    """
+    batches = []
+    prompt_tokens = count_tokens(BATCH_PROMPT_HEADER + BATCH_PROMPT_FOOTER)
+    batch_indices, batch_data, batch_tokens = [], [], prompt_tokens
+    explained = []      # indices of files with code, in file order
+    first_by_hash = {}  # content hash -> index of the first file with that content
+    duplicates = {}     # index -> index of the identical file that is sent instead
     
-    for root, dirs, files in os.walk(folder_path):
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        for file in sorted(files):
-            ext = os.path.splitext(file)[1].lower()
-            if ext in ALLOWED_EXTENSIONS:
-                file_path = os.path.join(root, file)
-                if os.path.getsize(file_path) <= 30_000:  # Smaller limit
-                    rel_path = os.path.relpath(file_path, folder_path)
-                    all_files.append((file_path, rel_path, ext, counter))
-                    counter += 1
-
-    # Process in batches of 3-5 files to reduce API calls
-    batch_size = min(4, max(2, len(all_files) // 10))  # Dynamic batch size
+    for idx, (rel_path, ext, code, counter) in enumerate(all_files):
+        if not code:
+            continue
+        explained.append(idx)
+
+        # Identical files (license headers, scaffolds...) are only explained once
+        content_hash = content_digest(code)
+        if content_hash in first_by_hash:
+            duplicates[idx] = first_by_hash[content_hash]
+            continue
+        first_by_hash[content_hash] = idx
+
+        snippet, snippet_tokens = trim_to_tokens(code, MAX_FILE_TOKENS)
+        cost = snippet_tokens + count_tokens(f"{rel_path} ({ext[1:]}):") + FILE_PROMPT_OVERHEAD
+        if batch_data and (batch_tokens + cost > MAX_INPUT_TOKENS or len(batch_data) >= MAX_BATCH_FILES):
+            batches.append((batch_indices, batch_data))
+            batch_indices, batch_data, batch_tokens = [], [], prompt_tokens
+        batch_indices.append(idx)
+        batch_data.append((rel_path, snippet, ext[1:], content_hash))
+        batch_tokens += cost
+
+    if batch_data:
+        batches.append((batch_indices, batch_data))
+    return explained, duplicates, batches
+
+async def render_explanations_and_quiz(
+    entries: Iterable[Tuple[str, str, str]], executor: ProcessPoolExecutor
+) -> AsyncIterator[Tuple[str, bytes]]:
+    """Explain entries with the LLM and yield the explanation and quiz PDFs as each is done.
+
+    Batches are sent to the LLM concurrently; PDFs are rendered on executor.
+    """
+    explanation_parts = ["# Project Explanations\n\n"]
+    all_files = number_entries(entries)
     explanations = [""] * len(all_files)
-    
-    for i in range(0, len(all_files), batch_size):
-        batch = all_files[i:i + batch_size]
-        batch_data = []
-        
-        # Prepare batch data
-        for file_path, rel_path, ext, counter in batch:
-            code = read_code(file_path)
-            if code:
-                batch_data.append((rel_path, code, ext[1:]))
-                # Add to code markdown
-                code_md += f"## {counter}. {safe_path(rel_path)}\n```{ext[1:]}\n{code}\n```\n\n"
-        
-        if batch_data:
-            print(f"🤖 Processing batch {i//batch_size + 1}/{(len(all_files)-1)//batch_size + 1} ({len(batch_data)} files)...")
-            batch_explanations = generate_batch_explanations(batch_data)
-            
-            # Assign explanations
-            for j, explanation in enumerate(batch_explanations):
-                idx = i + j
-                if idx < len(explanations):
-                    explanations[idx] = explanation
-                    rel_path = all_files[idx][1]
-                    explanation_md += f"## {all_files[idx][3]}. {safe_path(rel_path)}\n\n{explanation}\n\n"
-            
-            # Delay between batches
-            if i + batch_size < len(all_files):
-                delay = random.uniform(2, 5)
-                time.sleep(delay)
-
-    # Save outputs
-    print("💾 Saving outputs...")
-    save_pdf_from_markdown(code_md, os.path.join(OUTPUT_DIR, "code_only.pdf"))
-    save_pdf_from_markdown(explanation_md, os.path.join(OUTPUT_DIR, "code_with_explanation.pdf"))
-    
+    explained, duplicates, batches = await asyncio.to_thread(plan_batches, all_files)
+
+    # Send every batch at once; call_llm's semaphore bounds concurrency
+    print(f"🤖 Processing {len(batches)} batches ({LLM_CONCURRENCY} at a time)...")
+    results = await asyncio.gather(
+        *(generate_batch_explanations(batch_data) for _, batch_data in batches)
+    )
+
+    # Assign explanations, then fan them out to duplicate files, in file order
+    for (batch_indices, _), batch_explanations in zip(batches, results):
+        for idx, explanation in zip(batch_indices, batch_explanations):
+            explanations[idx] = explanation
+    for idx, original in duplicates.items():
+        explanations[idx] = explanations[original]
+    for idx in explained:
+        rel_path, _, _, counter = all_files[idx]
+        explanation_parts.append(f"## {counter}. {safe_path(rel_path)}\n\n{explanations[idx]}\n\n")
+    explanation_md = "".join(explanation_parts)
+
     # Generate simple quiz without API call
     quiz_md = generate_simple_quiz(explanations)
-    save_pdf_from_markdown(quiz_md, os.path.join(OUTPUT_DIR, "quiz.pdf"))
-    
-    print("✅ All done! PDFs saved in output folder")
+
+    # Render explanations and quiz in parallel; hand each out as soon as it is done
+    print("💾 Rendering explanation and quiz PDFs...")
+    loop = asyncio.get_running_loop()
+    pending = {
+        loop.run_in_executor(executor, render_pdf, explanation_md): "code_with_explanation.pdf",
+        loop.run_in_executor(executor, render_pdf, quiz_md): "quiz.pdf",
+    }
+    while pending:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for fut in done:
+            yield pending.pop(fut), fut.result()
 
 def generate_simple_quiz(explanations: List[str]) -> str:
     """Generate a simple quiz without API calls."""
-    quiz_md = "# Quick Project Quiz\n\n"
-    quiz_md += "## Based on the code explanations\n\n"
+    quiz_parts = ["# Quick Project Quiz\n\n", "## Based on the code explanations\n\n"]
     
     for i, explanation in enumerate(explanations[:10]):  # Limit to 10 questions
         if explanation and not explanation.startswith("⚠️"):
-            quiz_md += f"### Question {i+1}\n"
-            quiz_md += f"What does this code do?\n\n"
-            quiz_md += f"**Hint:** {explanation}\n\n"
-            quiz_md += "A) It processes data  \nB) It handles user input  \nC) It manages state  \nD) It renders UI\n\n"
-            quiz_md += "**Answer:** *Discuss with your team!*\n\n"
+            quiz_parts.append(f"### Question {i+1}\n")
+            quiz_parts.append("What does this code do?\n\n")
+            quiz_parts.append(f"**Hint:** {explanation}\n\n")
+            quiz_parts.append("A) It processes data  \nB) It handles user input  \nC) It manages state  \nD) It renders UI\n\n")
+            quiz_parts.append("**Answer:** *Discuss with your team!*\n\n")
     
-    return quiz_md
+    return "".join(quiz_parts)
 
 def main():
     if not API_KEY:
@@ -314,7 +567,8 @@ def main():
         print(f"❌ '{folder_path}' is not a valid folder.")
         sys.exit(1)
 
-    process_folder(folder_path)
+    load_encoding()
+    asyncio.run(process_folder(folder_path))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,45 +1,328 @@
 import os
-import re
 import sys
+import io
+import copy
+import heapq
+import threading
 import lizard
-import matplotlib.pyplot as plt
+import numpy as np
 import tempfile
 from datetime import datetime
-from fpdf import FPDF
 from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-from collections import defaultdict
-from explainer import ALLOWED_EXTENSIONS, EXCLUDE_DIRS
+from array import array
+from collections import Counter, defaultdict, namedtuple
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from operator import itemgetter
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
 
+try:
+    import numba  # optional: JIT-compiles the aggregation kernel below
+except ImportError:
+    numba = None
+
+# Same extensions as explainer.ALLOWED_EXTENSIONS, kept here so importing
+# report does not pull in explainer's WeasyPrint, tokenizer and LLM setup
+ALLOWED_EXTENSIONS = frozenset({".py", ".js", ".html", ".css", ".ts", ".jsx", ".java", ".cpp"})
 EXCLUDE_DIRS = {"node_modules", ".git", "__pycache__", "venv", ".idea", ".vscode"}
+_SRC_EXTS = (".js", ".py", ".java", ".cpp", ".c", ".ts", ".jsx")  # languages handed to lizard
+COMPLEXITY_BUCKET_EDGES = (5, 10, 20)  # upper bounds of the low/medium/high buckets
+_LOW_MAX, _MEDIUM_MAX, _HIGH_MAX = COMPLEXITY_BUCKET_EDGES
+LONG_FUNCTION_LOC = 50
+LIZARD_POOL_MIN_FILES = 32  # smaller scans run in-process; starting workers costs more
 OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "output")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+CHART_FIGSIZE = (8, 6)
+CHART_DPI = 100
+
+@lru_cache(maxsize=None)
+def _matplotlib():
+    """Import and configure matplotlib once, on first chart or from the warm-up thread."""
+    import matplotlib
+    matplotlib.use("Agg")  # headless; no GUI backend to initialize
+    matplotlib.rcParams["path.simplify"] = True
+    from matplotlib.figure import Figure
+    return matplotlib, Figure
+
+def _warm_matplotlib():
+    """Pay matplotlib's import, font-cache and Agg setup cost once, off the request path."""
+    try:
+        _, Figure = _matplotlib()
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure(figsize=CHART_FIGSIZE)
+        fig.text(0.5, 0.5, "warm-up")
+        FigureCanvasAgg(fig).draw()
+    except Exception as e:
+        print(f"⚠️ matplotlib warm-up failed: {e}")
+
+# The lizard scan runs for a while before the first chart, so warm up meanwhile;
+# set REPORT_WARM_MPL=0 to skip (e.g. in tests)
+if os.environ.get("REPORT_WARM_MPL", "1") == "1":
+    threading.Thread(target=_warm_matplotlib, name="warm-matplotlib", daemon=True).start()
+
+def new_chart_figure():
+    """Build a standalone Figure/Axes pair (object-oriented API, no pyplot state)."""
+    _, Figure = _matplotlib()
+    fig = Figure(figsize=CHART_FIGSIZE)
+    return fig, fig.subplots()
+
+def reset_chart_figure(fig, ax):
+    """Clear ax for the next chart and undo any tight_layout margins from the last one."""
+    matplotlib, _ = _matplotlib()
+    ax.clear()
+    fig.subplots_adjust(**{side: matplotlib.rcParams[f"figure.subplot.{side}"]
+                           for side in ("left", "right", "bottom", "top")})
+
+class SharedChartFigure:
+    """One Figure/Axes pair reused by several charts; built only when the first chart is drawn."""
+
+    def __init__(self):
+        self._pair = None
+
+    def axes(self):
+        """(fig, ax) ready for a new chart: created on first use, cleared after that."""
+        if self._pair is None:
+            self._pair = new_chart_figure()
+        else:
+            reset_chart_figure(*self._pair)
+        return self._pair
+
+# ReportLab styles and the fixed headings are built once per process and shared
+_STYLES = None
+_STATIC_PARAS = None
+_STATIC_PARA_TEXT = {
+    "cover_title": ("CODE ANALYSIS REPORT", "Title"),
+    "generated_by": ("Generated by: Code Analysis Tool", "Italic"),
+    "exec_hdr": ("EXECUTIVE SUMMARY", "Heading1Blue"),
+    "detailed_hdr": ("DETAILED ANALYSIS", "Heading1Blue"),
+    "overview": ("Project Overview", "Heading2Blue"),
+    "complexity_chart": ("Complexity Distribution", "Heading2Blue"),
+    "file_type_chart": ("File Type Distribution", "Heading2Blue"),
+    "complexity": ("Complexity Analysis", "Heading2Blue"),
+    "top_complex": ("Top Complex Functions", "Heading2Blue"),
+    "detailed": ("Detailed Analysis", "Heading2Blue"),
+    "recommendations": ("Code Quality Recommendations", "Heading2Blue"),
+}
+_TOP_COMPLEX_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2C3E50')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ECF0F1')),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+def _styles():
+    """The sample stylesheet plus the report's custom heading styles, built on first use."""
+    global _STYLES
+    if _STYLES is None:
+        styles = getSampleStyleSheet()
+        styles.add(ParagraphStyle(
+            name='Heading1Blue',
+            parent=styles['Heading1'],
+            textColor=colors.HexColor('#2C3E50'),
+            spaceAfter=14
+        ))
+        styles.add(ParagraphStyle(
+            name='Heading2Blue',
+            parent=styles['Heading2'],
+            textColor=colors.HexColor('#2C3E50'),
+            spaceAfter=12
+        ))
+        _STYLES = styles
+    return _STYLES
+
+def _static_para(key):
+    """A fixed heading Paragraph, parsed once and shallow-copied per use.
+
+    Paragraphs keep layout state while a document flows, so each report gets its
+    own copy that still shares the already-parsed text fragments.
+    """
+    global _STATIC_PARAS
+    if _STATIC_PARAS is None:
+        styles = _styles()
+        _STATIC_PARAS = {
+            name: Paragraph(text, styles[style])
+            for name, (text, style) in _STATIC_PARA_TEXT.items()
+        }
+    return copy.copy(_STATIC_PARAS[key])
 
 def remove_unicode(text):
-    return re.sub(r'[^\x00-\x7F]+', '', text)
+    # the ascii codec drops every non-ASCII character in one C-level pass
+    return str(text).encode('ascii', 'ignore').decode('ascii')
+
+@dataclass
+class FnStats:
+    """Per-function metrics as parallel numpy arrays (one entry per lizard function)."""
+    cc: np.ndarray
+    length: np.ndarray
+
+class ComplexityTotals(namedtuple("ComplexityTotals", [
+        "n", "sum_cc", "sum_length", "max_cc", "low", "medium", "high", "very_high", "long"])):
+    """Report-wide aggregates; low..very_high are the complexity bucket counts."""
+    __slots__ = ()
+
+    @property
+    def avg_complexity(self):
+        return self.sum_cc / self.n
+
+    @property
+    def avg_length(self):
+        return self.sum_length / self.n
+
+    @property
+    def complex_count(self):  # CC > 10
+        return self.high + self.very_high
+
+def _aggregate_loop(cc, length):
+    """One pass over the metric columns: counts, sums, max and bucket counts."""
+    n = cc.size
+    sum_cc = 0
+    sum_length = 0
+    max_cc = 0
+    low = medium = high = very_high = long_count = 0
+    for i in range(n):
+        c = cc[i]
+        sum_cc += c
+        if c > max_cc:
+            max_cc = c
+        if c <= _LOW_MAX:
+            low += 1
+        elif c <= _MEDIUM_MAX:
+            medium += 1
+        elif c <= _HIGH_MAX:
+            high += 1
+        else:
+            very_high += 1
+        loc = length[i]
+        sum_length += loc
+        if loc > LONG_FUNCTION_LOC:
+            long_count += 1
+    return n, sum_cc, sum_length, max_cc, low, medium, high, very_high, long_count
+
+def _aggregate_numpy(cc, length):
+    """Vectorized equivalent of _aggregate_loop for when numba is unavailable."""
+    buckets = np.digitize(cc, COMPLEXITY_BUCKET_EDGES, right=True)
+    low, medium, high, very_high = np.bincount(buckets, minlength=4).tolist()
+    return (cc.size, int(cc.sum()), int(length.sum()), int(cc.max(initial=0)),
+            low, medium, high, very_high, int(np.count_nonzero(length > LONG_FUNCTION_LOC)))
 
-def create_complexity_chart(functions, output_path):
-    # Prepare data for chart
-    complexities = [func.cyclomatic_complexity for func in functions]
+if numba is not None:
+    _aggregate = numba.njit(cache=True)(_aggregate_loop)
+    # compile (or load from the on-disk cache) now so reports don't pay the JIT latency
+    _aggregate(np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64))
+else:
+    _aggregate = _aggregate_numpy
+
+def _push_top(heap, k, item):
+    """Keep the k largest items seen so far in the min-heap heap."""
+    if len(heap) < k:
+        heapq.heappush(heap, item)
+    else:
+        heapq.heappushpop(heap, item)
+
+class ReportAccumulator:
+    """Streaming reducer over lizard results.
+
+    Function objects are never kept: each function is folded into compact metric
+    columns plus the few bounded top-N heaps and lists the report prints. A
+    function summary is a (name, cyclomatic_complexity, length, file) tuple.
+    """
+    TOP_K = 10            # rows in the "Top Complex Functions" table
+    MAX_COMPLEX = 5       # most complex CC > 10 functions listed in the stats
+    MAX_VERY_COMPLEX = 3  # CC > 20 examples listed in the suggestions
+    MAX_LONG = 3          # longest LOC > 50 functions listed in the stats
+
+    def __init__(self):
+        self._cc = array("q")
+        self._length = array("q")
+        self.file_count = 0
+        self.total_complexity = 0
+        self.file_complexities = {}
+        self._top_complex = []  # min-heap of (cc, -seq, summary), TOP_K largest
+        self._top_long = []  # min-heap of (length, -seq, summary) with LOC > 50, MAX_LONG largest
+        self.very_complex_funcs = []  # first MAX_VERY_COMPLEX summaries with CC > 20
+
+    def __len__(self):
+        return len(self._cc)
+
+    def add_file(self, file, functions):
+        """Fold one analyzed file's (name, cc, length) tuples into the totals."""
+        file_complexity = 0
+        for name, cc, length in functions:
+            self.add((name, cc, length, file))
+            file_complexity += cc
+        self.file_count += 1
+        self.total_complexity += file_complexity
+        self.file_complexities[file] = file_complexity
+
+    def add(self, summary):
+        _, cc, length, _ = summary
+        seq = len(self._cc)
+        self._cc.append(cc)
+        self._length.append(length)
+        # -seq keeps the earlier function on ties, like heapq.nlargest / a stable sort
+        _push_top(self._top_complex, self.TOP_K, (cc, -seq, summary))
+        if length > LONG_FUNCTION_LOC:
+            _push_top(self._top_long, self.MAX_LONG, (length, -seq, summary))
+        if cc > 20 and len(self.very_complex_funcs) < self.MAX_VERY_COMPLEX:
+            self.very_complex_funcs.append(summary)
+
+    def top_complex(self):
+        """The TOP_K most complex function summaries, highest first."""
+        return [summary for _, _, summary in sorted(self._top_complex, reverse=True)]
+
+    @property
+    def complex_funcs(self):
+        """The MAX_COMPLEX most complex functions with CC > 10, highest first."""
+        return [s for s in self.top_complex()[:self.MAX_COMPLEX] if s[1] > 10]
+
+    @property
+    def long_funcs(self):
+        """The MAX_LONG longest functions with LOC > 50, longest first."""
+        return [summary for _, _, summary in sorted(self._top_long, reverse=True)]
+
+    @cached_property
+    def stats(self):
+        """Metric columns as numpy arrays; read once accumulation is finished."""
+        return FnStats(
+            cc=np.frombuffer(self._cc, dtype=np.int64),
+            length=np.frombuffer(self._length, dtype=np.int64),
+        )
+
+    @cached_property
+    def totals(self):
+        """ComplexityTotals computed in a single pass over the metric columns."""
+        return ComplexityTotals(*_aggregate(self.stats.cc, self.stats.length))
+
+def _png_bytes(fig):
+    """Render fig to PNG in memory, so concurrent reports never share chart files."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=CHART_DPI)
+    return buf.getvalue()
+
+def create_complexity_chart(totals, figure=None):
+    # Bucket counts: <=5, 6-10, 11-20, >20
+    values = [totals.low, totals.medium, totals.high, totals.very_high]
     
-    # Categorize complexity
-    low = len([c for c in complexities if c <= 5])
-    medium = len([c for c in complexities if 5 < c <= 10])
-    high = len([c for c in complexities if 10 < c <= 20])
-    very_high = len([c for c in complexities if c > 20])
+    # Nothing worth plotting when there are no functions or all share one bucket
+    if sum(1 for v in values if v) <= 1:
+        return None
+    
+    fig, ax = figure.axes() if figure is not None else new_chart_figure()
     
     # Create bar chart
     categories = ['Low (1-5)', 'Medium (6-10)', 'High (11-20)', 'Very High (20+)']
-    values = [low, medium, high, very_high]
     
     # Create the chart
-    fig, ax = plt.subplots(figsize=(8, 6))
     bars = ax.bar(categories, values, color=['green', 'yellow', 'orange', 'red'])
     
     # Add value labels on bars
@@ -50,222 +333,266 @@ def create_complexity_chart(functions, output_path):
     
     ax.set_ylabel('Number of Functions')
     ax.set_title('Cyclomatic Complexity Distribution')
-    plt.tight_layout()
-    
-    # Save the chart
-    chart_path = os.path.join(output_path, 'complexity_chart.png')
-    plt.savefig(chart_path)
-    plt.close()
+    fig.tight_layout()
     
-    return chart_path
+    return _png_bytes(fig)
 
-def create_file_type_chart(file_types, output_path):
+def create_file_type_chart(file_types, figure=None):
     # Create pie chart for file types
     labels = list(file_types.keys())
     sizes = list(file_types.values())
+    if sum(sizes) == 0:
+        return None
+    
+    fig, ax = figure.axes() if figure is not None else new_chart_figure()
     
-    fig, ax = plt.subplots(figsize=(8, 6))
     ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
     ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
     ax.set_title('File Type Distribution')
     
-    # Save the chart
-    chart_path = os.path.join(output_path, 'file_types_chart.png')
-    plt.savefig(chart_path)
-    plt.close()
-    
-    return chart_path
-
-def run_lizard(path):
-    results = []
-    file_count = 0
-    total_complexity = 0
-    file_complexities = {}
-    
-    for root, dirs, files in os.walk(path):
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        for file in files:
-            if any(file.endswith(ext) for ext in [".js", ".py", ".java", ".cpp", ".c", ".ts", ".jsx"]):
-                file_path = os.path.join(root, file)
-                try:
-                    file_analysis = lizard.analyze_file(file_path)
-                    results.extend(file_analysis.function_list)
-                    file_count += 1
-                    file_complexity = sum(func.cyclomatic_complexity for func in file_analysis.function_list)
-                    total_complexity += file_complexity
-                    file_complexities[file] = file_complexity
-                except Exception as e:
-                    print(f"⚠️ Error analyzing {file_path}: {e}")
-    
-    return results, file_count, total_complexity, file_complexities
-
-def generate_complexity_stats(functions):
-    if not functions:
+    return _png_bytes(fig)
+
+def _scan_project(project_path):
+    """Walk project_path once with os.scandir, pruning EXCLUDE_DIRS.
+
+    Returns a list of (path, name, ext) for every file, in os.walk order, so the
+    analysis helpers can share one traversal instead of walking the tree again.
+    """
+    files = []
+    subdirs = []
+    with os.scandir(project_path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in EXCLUDE_DIRS:
+                    subdirs.append(entry.path)
+            elif entry.is_file():
+                files.append((entry.path, entry.name, os.path.splitext(entry.name)[1].lower()))
+    for subdir in subdirs:
+        files.extend(_scan_project(subdir))
+    return files
+
+def _count_lines(path):
+    """Count lines by scanning raw bytes for newlines, without decoding the file."""
+    n = 0
+    last = b"\n"
+    with open(path, "rb", buffering=0) as f:
+        while chunk := f.read(1 << 20):
+            n += chunk.count(b"\n")
+            last = chunk[-1:]
+    # a final line without a trailing newline still counts, as with readlines()
+    return n if last == b"\n" else n + 1
+
+def _analyze_file(file_path):
+    """Process-pool worker: (path, [(name, cc, length), ...] or None, error message or None).
+
+    Only plain metric tuples are sent back, not lizard's FunctionInfo objects.
+    """
+    try:
+        file_analysis = lizard.analyze_file(file_path)
+    except Exception as e:
+        return file_path, None, str(e)
+    functions = [
+        (func.name, func.cyclomatic_complexity, func.length)
+        for func in file_analysis.function_list
+    ]
+    return file_path, functions, None
+
+@lru_cache(maxsize=None)
+def _lizard_pool():
+    """Process pool for large lizard scans, created on first use and then reused.
+
+    Workers are started once, not forked again from the (multi-threaded)
+    server for every report.
+    """
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+
+def run_lizard(files):
+    acc = ReportAccumulator()
+    
+    targets = [
+        (file_path, file) for file_path, file, _ in files
+        if file.endswith(_SRC_EXTS)
+    ]
+    if not targets:
+        return acc
+
+    file_paths = [file_path for file_path, _ in targets]
+    if len(targets) < LIZARD_POOL_MIN_FILES:
+        analyses = map(_analyze_file, file_paths)
+    else:
+        # Each file is analyzed independently, so spread them over all cores;
+        # chunksize amortizes the pickling round-trip per task
+        workers = min(os.cpu_count() or 1, len(targets))
+        chunksize = max(1, len(targets) // (4 * workers))
+        analyses = _lizard_pool().map(_analyze_file, file_paths, chunksize=chunksize)
+    for (file_path, file), (_, functions, error) in zip(targets, analyses):
+        if error is not None:
+            print(f"⚠️ Error analyzing {file_path}: {error}")
+            continue
+        acc.add_file(file, functions)
+    
+    return acc
+
+def generate_complexity_stats(acc):
+    if not acc:
         return "No functions analyzed."
     
     # Calculate statistics
-    complexities = [func.cyclomatic_complexity for func in functions]
-    locs = [func.length for func in functions]
-    nloc = [func.nloc for func in functions]
+    totals = acc.totals
     
     stats = [
-        f"<b>Total Functions:</b> {len(functions)}",
-        f"<b>Average Complexity:</b> {sum(complexities)/len(complexities):.2f}",
-        f"<b>Max Complexity:</b> {max(complexities)}",
-        f"<b>Average LOC:</b> {sum(locs)/len(locs):.2f}",
-        f"<b>Total LOC:</b> {sum(locs)}",
-        f"<b>Maintainability Index:</b> {calculate_maintainability_index(complexities, locs, nloc):.2f}"
+        f"<b>Total Functions:</b> {totals.n}",
+        f"<b>Average Complexity:</b> {totals.avg_complexity:.2f}",
+        f"<b>Max Complexity:</b> {totals.max_cc}",
+        f"<b>Average LOC:</b> {totals.avg_length:.2f}",
+        f"<b>Total LOC:</b> {totals.sum_length}",
+        f"<b>Maintainability Index:</b> {calculate_maintainability_index(totals.n, totals.sum_cc, totals.sum_length):.2f}"
     ]
     
     # Identify complex functions (complexity > 10)
-    complex_funcs = [func for func in functions if func.cyclomatic_complexity > 10]
-    if complex_funcs:
-        stats.append(f"<br/><b>⚠️ Complex Functions (CC > 10):</b> {len(complex_funcs)}")
-        for func in complex_funcs[:5]:  # Show top 5 most complex
-            stats.append(f"  - {func.name}: CC={func.cyclomatic_complexity}, LOC={func.length}, File: {os.path.basename(func.filename)}")
+    if totals.complex_count:
+        stats.append(f"<br/><b>⚠️ Complex Functions (CC > 10):</b> {totals.complex_count}")
+        for name, func_cc, length, file in acc.complex_funcs:
+            stats.append(f"  - {name}: CC={func_cc}, LOC={length}, File: {file}")
     
     # Identify long functions (LOC > 50)
-    long_funcs = [func for func in functions if func.length > 50]
-    if long_funcs:
-        stats.append(f"<br/><b>⚠️ Long Functions (LOC > 50):</b> {len(long_funcs)}")
-        for func in long_funcs[:3]:  # Show top 3 longest
-            stats.append(f"  - {func.name}: LOC={func.length}, CC={func.cyclomatic_complexity}, File: {os.path.basename(func.filename)}")
+    if totals.long:
+        stats.append(f"<br/><b>⚠️ Long Functions (LOC > 50):</b> {totals.long}")
+        for name, func_cc, length, file in acc.long_funcs:
+            stats.append(f"  - {name}: LOC={length}, CC={func_cc}, File: {file}")
     
     return "<br/>".join(stats)
 
-def calculate_maintainability_index(complexities, locs, nloc):
-    # Simplified maintainability index calculation
-    if not complexities:
-        return 100
-    
-    avg_complexity = sum(complexities) / len(complexities)
-    avg_loc = sum(locs) / len(locs)
+@lru_cache(maxsize=32)
+def calculate_maintainability_index(n, sum_cc, sum_loc):
+    # Simplified maintainability index calculation from per-function totals;
+    # integer inputs make the cache hit again when a project is re-analyzed
+    avg_complexity = sum_cc / n
+    avg_loc = sum_loc / n
     
     # Heuristic formula (not the standard one but useful for comparison)
     mi = max(0, 100 - (avg_complexity * 2) - (avg_loc / 2))
     return min(100, mi)
 
-def generate_report(project_path):
+@dataclass
+class ReportData:
+    """Everything the PDF needs, as picklable text, table rows and PNG bytes."""
+    project_name: str
+    generated_at: str
+    exec_summary: str
+    summary_text: str
+    complexity_chart: Optional[bytes]
+    file_type_chart: Optional[bytes]
+    complexity_stats: str
+    top_complex: list
+    detailed_analysis: str
+    ai_suggestions: str
+
+# ReportLab layout is CPU-bound; run it in worker processes so callers are not blocked
+_PDF_POOL = ProcessPoolExecutor(max_workers=2)
+
+def _collect_data(project_path):
+    """Analyze project_path and render its charts into a ReportData."""
     print("📊 Running complexity analysis...")
-    functions, file_count, total_complexity, file_complexities = run_lizard(project_path)
-    complexity_stats = generate_complexity_stats(functions)
+    files = _scan_project(project_path)  # single traversal shared by all helpers
+    acc = run_lizard(files)  # streamed totals; no lizard objects are kept
     
-    # Create charts
-    charts_dir = os.path.join(OUTPUT_DIR, "charts")
-    os.makedirs(charts_dir, exist_ok=True)
-    complexity_chart = create_complexity_chart(functions, charts_dir)
+    # Create charts, drawing both on one Figure that is cleared in between; the
+    # Figure is only built once a chart is actually drawn
+    figure = SharedChartFigure()
+    complexity_chart = create_complexity_chart(acc.totals, figure)
     
     # Get file type distribution
-    file_types = get_file_type_distribution(project_path)
-    file_type_chart = create_file_type_chart(file_types, charts_dir) if file_types else None
-    
-    summary_text = generate_project_summary(project_path, file_count, total_complexity, file_types)
-    ai_suggestions = generate_ai_suggestions(functions)
-    detailed_analysis = generate_detailed_analysis(functions, file_complexities)
-    
-    # Create PDF with ReportLab
-    output_path = os.path.join(OUTPUT_DIR, "project_analysis_report.pdf")
+    file_types = get_file_type_distribution(files)
+    file_type_chart = None
+    if file_types:
+        file_type_chart = create_file_type_chart(file_types, figure)
+    
+    return ReportData(
+        project_name=os.path.basename(project_path),
+        generated_at=datetime.now().strftime('%Y-%m-%d %H:%M'),
+        exec_summary=generate_executive_summary(acc, file_types),
+        summary_text=generate_project_summary(project_path, files, acc.file_count, acc.total_complexity, file_types),
+        complexity_chart=complexity_chart,
+        file_type_chart=file_type_chart,
+        complexity_stats=generate_complexity_stats(acc),
+        top_complex=acc.top_complex(),
+        detailed_analysis=generate_detailed_analysis(acc),
+        ai_suggestions=generate_ai_suggestions(acc),
+    )
+
+def _render_pdf(data, output_path):
+    """Lay out and write the ReportLab PDF for data; runs in a _PDF_POOL worker."""
     doc = SimpleDocTemplate(output_path, pagesize=letter)
-    styles = getSampleStyleSheet()
-    
-    # Add custom styles
-    styles.add(ParagraphStyle(
-        name='Heading1Blue',
-        parent=styles['Heading1'],
-        textColor=colors.HexColor('#2C3E50'),
-        spaceAfter=14
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='Heading2Blue',
-        parent=styles['Heading2'],
-        textColor=colors.HexColor('#2C3E50'),
-        spaceAfter=12
-    ))
+    styles = _styles()
     
     story = []
     
     # Cover page
-    story.append(Paragraph("CODE ANALYSIS REPORT", styles["Title"]))
+    story.append(_static_para("cover_title"))
     story.append(Spacer(1, 20))
-    story.append(Paragraph(f"Project: {os.path.basename(project_path)}", styles["Heading2"]))
-    story.append(Paragraph(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles["Normal"]))
-    story.append(Paragraph(f"Generated by: Code Analysis Tool", styles["Italic"]))
+    story.append(Paragraph(f"Project: {data.project_name}", styles["Heading2"]))
+    story.append(Paragraph(f"Date: {data.generated_at}", styles["Normal"]))
+    story.append(_static_para("generated_by"))
     story.append(Spacer(1, 60))
-    story.append(Paragraph("EXECUTIVE SUMMARY", styles["Heading1Blue"]))
+    story.append(_static_para("exec_hdr"))
     story.append(Spacer(1, 20))
     
     # Executive summary
-    exec_summary = generate_executive_summary(file_count, total_complexity, functions, file_types)
-    story.append(Paragraph(exec_summary, styles["Normal"]))
+    story.append(Paragraph(data.exec_summary, styles["Normal"]))
     story.append(Spacer(1, 30))
     
     # Add page break
     story.append(Spacer(1, 30))
-    story.append(Paragraph("DETAILED ANALYSIS", styles["Heading1Blue"]))
+    story.append(_static_para("detailed_hdr"))
     
     # Project info
-    story.append(Paragraph("Project Overview", styles["Heading2Blue"]))
-    story.append(Paragraph(summary_text, styles["Normal"]))
+    story.append(_static_para("overview"))
+    story.append(Paragraph(data.summary_text, styles["Normal"]))
     story.append(Spacer(1, 20))
     
     # Add complexity chart
-    if os.path.exists(complexity_chart):
-        story.append(Paragraph("Complexity Distribution", styles["Heading2Blue"]))
-        img = Image(complexity_chart, width=6*inch, height=4.5*inch)
+    if data.complexity_chart:
+        story.append(_static_para("complexity_chart"))
+        img = Image(io.BytesIO(data.complexity_chart), width=6*inch, height=4.5*inch)
         story.append(img)
         story.append(Spacer(1, 20))
     
     # Add file type chart if available
-    if file_type_chart and os.path.exists(file_type_chart):
-        story.append(Paragraph("File Type Distribution", styles["Heading2Blue"]))
-        img = Image(file_type_chart, width=6*inch, height=4.5*inch)
+    if data.file_type_chart:
+        story.append(_static_para("file_type_chart"))
+        img = Image(io.BytesIO(data.file_type_chart), width=6*inch, height=4.5*inch)
         story.append(img)
         story.append(Spacer(1, 20))
     
     # Complexity Analysis
-    story.append(Paragraph("Complexity Analysis", styles["Heading2Blue"]))
-    story.append(Paragraph(complexity_stats, styles["Normal"]))
+    story.append(_static_para("complexity"))
+    story.append(Paragraph(data.complexity_stats, styles["Normal"]))
     story.append(Spacer(1, 20))
     
     # Detailed functions
-    if functions:
-        story.append(Paragraph("Top Complex Functions", styles["Heading2Blue"]))
+    if data.top_complex:
+        story.append(_static_para("top_complex"))
         
         # Prepare table data
         table_data = [['Function', 'Complexity', 'LOC', 'File']]
-        for func in sorted(functions, key=lambda x: x.cyclomatic_complexity, reverse=True)[:10]:
-            table_data.append([
-                func.name, 
-                str(func.cyclomatic_complexity),
-                str(func.length),
-                os.path.basename(func.filename)
-            ])
+        for name, cc, length, file in data.top_complex:
+            table_data.append([name, str(cc), str(length), file])
         
         # Create table
         table = Table(table_data, colWidths=[2*inch, 1*inch, 1*inch, 2*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2C3E50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ECF0F1')),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        table.setStyle(_TOP_COMPLEX_TABLE_STYLE)
         story.append(table)
         story.append(Spacer(1, 20))
     
     # Detailed analysis
-    story.append(Paragraph("Detailed Analysis", styles["Heading2Blue"]))
-    story.append(Paragraph(detailed_analysis, styles["Normal"]))
+    story.append(_static_para("detailed"))
+    story.append(Paragraph(data.detailed_analysis, styles["Normal"]))
     story.append(Spacer(1, 20))
     
     # Suggestions
-    story.append(Paragraph("Code Quality Recommendations", styles["Heading2Blue"]))
-    story.append(Paragraph(ai_suggestions, styles["Normal"]))
+    story.append(_static_para("recommendations"))
+    story.append(Paragraph(data.ai_suggestions, styles["Normal"]))
     
     # Build PDF
     doc.build(story)
@@ -273,28 +600,35 @@ def generate_report(project_path):
     
     return output_path
 
-def get_file_type_distribution(project_path):
+def generate_report(project_path, output_path=None):
+    """Analyze project_path now and build its PDF in the background.
+
+    Returns a concurrent.futures.Future resolving to the written PDF path
+    (default OUTPUT_DIR/project_analysis_report.pdf). The project directory is
+    no longer needed once this returns.
+    """
+    if output_path is None:
+        output_path = os.path.join(OUTPUT_DIR, "project_analysis_report.pdf")
+    data = _collect_data(project_path)
+    return _PDF_POOL.submit(_render_pdf, data, output_path)
+
+def get_file_type_distribution(files):
     file_types = defaultdict(int)
     
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        for file in files:
-            ext = os.path.splitext(file)[1].lower()
-            if ext in ALLOWED_EXTENSIONS:
-                file_types[ext] += 1
+    for _, _, ext in files:
+        if ext in ALLOWED_EXTENSIONS:
+            file_types[ext] += 1
     
     return dict(file_types)
 
-def generate_executive_summary(file_count, total_complexity, functions, file_types):
+def generate_executive_summary(acc, file_types):
     """Generate an executive summary with key metrics"""
-    if not functions:
+    if not acc:
         return "No functions analyzed for executive summary."
     
-    complexities = [func.cyclomatic_complexity for func in functions]
-    locs = [func.length for func in functions]
-    
     # Calculate quality score (0-100)
-    avg_complexity = sum(complexities) / len(complexities)
+    totals = acc.totals
+    avg_complexity = totals.avg_complexity
     quality_score = max(0, 100 - (avg_complexity * 5))
     
     # Determine quality rating
@@ -312,21 +646,21 @@ def generate_executive_summary(file_count, total_complexity, functions, file_typ
         color = "red"
     
     summary = [
-        f"This report provides a comprehensive analysis of the codebase with {file_count} files ",
-        f"and {len(functions)} functions. The overall code quality score is ",
+        f"This report provides a comprehensive analysis of the codebase with {acc.file_count} files ",
+        f"and {len(acc)} functions. The overall code quality score is ",
         f"<b><font color={color}>{quality_score:.1f}/100 ({rating})</font></b>.",
         "<br/><br/>",
         f"<b>Key Metrics:</b>",
         f"• Average Cyclomatic Complexity: {avg_complexity:.2f}",
-        f"• Total Lines of Code: {sum(locs)}",
+        f"• Total Lines of Code: {totals.sum_length}",
         f"• File Types: {', '.join([f'{count} {ext}' for ext, count in file_types.items()])}",
         "<br/>",
-        f"<b>Recommendation:</b> {get_overall_recommendation(quality_score, functions)}"
+        f"<b>Recommendation:</b> {get_overall_recommendation(quality_score, totals)}"
     ]
     
     return "".join(summary)
 
-def get_overall_recommendation(quality_score, functions):
+def get_overall_recommendation(quality_score, totals):
     if quality_score >= 80:
         return "Code quality is excellent. Maintain current standards with regular reviews."
     elif quality_score >= 60:
@@ -334,133 +668,132 @@ def get_overall_recommendation(quality_score, functions):
     elif quality_score >= 40:
         return "Code quality needs attention. Prioritize refactoring of complex components and add tests."
     else:
-        complex_funcs = len([f for f in functions if f.cyclomatic_complexity > 10])
+        complex_funcs = totals.complex_count
         return f"Code quality needs significant improvement. Refactor {complex_funcs} complex functions and improve test coverage."
 
-def generate_project_summary(project_path, file_count, total_complexity, file_types):
+# Fixed tails of the summary and suggestions sections, pre-joined with <br/>
+_ANALYSIS_SCOPE = "<br/>".join([
+    "<br/>",
+    "<b>Analysis Scope:</b>",
+    "This report analyzes JavaScript, Python, Java, C++, C, TypeScript, and JSX files.",
+    "Excluded directories: node_modules, .git, __pycache__, venv, .idea, .vscode"
+])
+_STATIC_BEST_PRACTICES = "<br/>".join([
+    "<br/>",
+    "<b>General Best Practices:</b>",
+    "• Add comments to complex algorithms for better maintainability",
+    "• Consider adding unit tests for critical functions, especially those with high complexity",
+    "• Implement code review processes to catch complexity issues early",
+    "• Use static analysis tools in your CI/CD pipeline",
+    "• Consider using guard clauses and early returns to reduce nesting",
+    "• Extract complex conditions into well-named helper functions or variables",
+    "<br/>",
+    "<b>Technology-Specific Suggestions:</b>",
+    "• For React components: Consider splitting large components into smaller presentational and container components",
+    "• For JavaScript: Use modern ES6+ features like arrow functions, destructuring, and async/await to simplify code",
+    "• For Python: Use list comprehensions and built-in functions where appropriate to reduce complexity",
+    "• For Java/C++: Consider using design patterns to manage complexity in large codebases"
+])
+
+def generate_project_summary(project_path, files, file_count, total_complexity, file_types):
     """Generate a detailed project summary"""
     total_loc = 0
-    file_details = defaultdict(list)
-    
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        for file in files:
-            ext = os.path.splitext(file)[1].lower()
-            if ext in ALLOWED_EXTENSIONS:
-                try:
-                    with open(os.path.join(root, file), 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = len(f.readlines())
-                        total_loc += lines
-                        file_details[ext].append((file, lines))
-                except:
-                    pass
-    
-    summary = [
-        f"<b>Project Name:</b> {os.path.basename(project_path)}",
-        f"<b>Total Files Analyzed:</b> {file_count}",
-        f"<b>Total Lines of Code:</b> {total_loc}",
-        f"<b>Total Cyclomatic Complexity:</b> {total_complexity}",
-        "<br/>",
-        f"<b>File Type Breakdown:</b>"
-    ]
-    
-    for ext, files in file_details.items():
-        file_count = len(files)
-        loc_sum = sum(loc for _, loc in files)
-        summary.append(f"• {ext}: {file_count} files, {loc_sum} LOC")
-    
-    summary.extend([
-        "<br/>",
-        "<b>Analysis Scope:</b>",
-        "This report analyzes JavaScript, Python, Java, C++, C, TypeScript, and JSX files.",
-        "Excluded directories: node_modules, .git, __pycache__, venv, .idea, .vscode"
-    ])
-    
-    return "<br/>".join(summary)
+    ext_counts = Counter()
+    ext_loc_sum = Counter()
+    
+    for file_path, _, ext in files:
+        if ext in ALLOWED_EXTENSIONS:
+            try:
+                lines = _count_lines(file_path)
+            except OSError:
+                continue
+            total_loc += lines
+            ext_counts[ext] += 1
+            ext_loc_sum[ext] += lines
+    
+    parts = []
+    append = parts.append
+    append(f"<b>Project Name:</b> {os.path.basename(project_path)}")
+    append(f"<b>Total Files Analyzed:</b> {file_count}")
+    append(f"<b>Total Lines of Code:</b> {total_loc}")
+    append(f"<b>Total Cyclomatic Complexity:</b> {total_complexity}")
+    append("<br/>")
+    append("<b>File Type Breakdown:</b>")
+    
+    for ext, count in ext_counts.items():
+        append(f"• {ext}: {count} files, {ext_loc_sum[ext]} LOC")
+    
+    append(_ANALYSIS_SCOPE)
+    
+    return "<br/>".join(parts)
 
-def generate_detailed_analysis(functions, file_complexities):
+def generate_detailed_analysis(acc):
     """Generate detailed analysis with specific insights"""
-    if not functions:
+    if not acc:
         return "No functions analyzed for detailed analysis."
     
     # Find most complex files
-    complex_files = sorted(file_complexities.items(), key=lambda x: x[1], reverse=True)[:5]
-    
-    analysis = [
-        "<b>Key Findings:</b>",
-        f"• Codebase contains {len(functions)} functions with an average complexity of {sum(f.cyclomatic_complexity for f in functions)/len(functions):.2f}",
-        f"• {len([f for f in functions if f.cyclomatic_complexity > 10])} functions exceed the recommended complexity threshold (CC > 10)",
-        f"• {len([f for f in functions if f.length > 50])} functions are longer than recommended (LOC > 50)",
-        "<br/>",
-        "<b>Most Complex Files:</b>"
-    ]
+    totals = acc.totals
+    complex_files = heapq.nlargest(5, acc.file_complexities.items(), key=itemgetter(1))
+    
+    parts = []
+    append = parts.append
+    append("<b>Key Findings:</b>")
+    append(f"• Codebase contains {totals.n} functions with an average complexity of {totals.avg_complexity:.2f}")
+    append(f"• {totals.complex_count} functions exceed the recommended complexity threshold (CC > 10)")
+    append(f"• {totals.long} functions are longer than recommended (LOC > 50)")
+    append("<br/>")
+    append("<b>Most Complex Files:</b>")
     
     for file, complexity in complex_files:
-        analysis.append(f"• {file}: {complexity} total complexity")
+        append(f"• {file}: {complexity} total complexity")
     
-    analysis.extend([
-        "<br/>",
-        "<b>Maintainability Assessment:</b>",
-        f"The maintainability index of {calculate_maintainability_index([f.cyclomatic_complexity for f in functions], [f.length for f in functions], [f.nloc for f in functions]):.2f} indicates " + 
-        ("excellent maintainability" if calculate_maintainability_index([f.cyclomatic_complexity for f in functions], [f.length for f in functions], [f.nloc for f in functions]) > 80 
-         else "good maintainability" if calculate_maintainability_index([f.cyclomatic_complexity for f in functions], [f.length for f in functions], [f.nloc for f in functions]) > 60 
-         else "moderate maintainability" if calculate_maintainability_index([f.cyclomatic_complexity for f in functions], [f.length for f in functions], [f.nloc for f in functions]) > 40 
-         else "poor maintainability")
-    ])
+    # Compute the maintainability index once and reuse it for the rating
+    mi = calculate_maintainability_index(totals.n, totals.sum_cc, totals.sum_length)
+    rating = ("excellent" if mi > 80 else "good" if mi > 60
+              else "moderate" if mi > 40 else "poor")
+    
+    append("<br/>")
+    append("<b>Maintainability Assessment:</b>")
+    append(f"The maintainability index of {mi:.2f} indicates {rating} maintainability")
     
-    return "<br/>".join(analysis)
+    return "<br/>".join(parts)
 
-def generate_ai_suggestions(functions):
+def generate_ai_suggestions(acc):
     """Generate detailed suggestions based on complexity analysis"""
-    if not functions:
+    if not acc:
         return "No functions analyzed for suggestions."
     
-    complex_funcs = [f for f in functions if f.cyclomatic_complexity > 10]
-    long_funcs = [f for f in functions if f.length > 50]
-    very_complex_funcs = [f for f in functions if f.cyclomatic_complexity > 20]
+    totals = acc.totals
+    complex_count = totals.complex_count
+    long_count = totals.long
+    very_complex_count = totals.very_high
     
-    suggestions = ["<b>Priority Recommendations:</b>"]
+    parts = ["<b>Priority Recommendations:</b>"]
+    append = parts.append
     
-    if very_complex_funcs:
-        suggestions.append(f"• <font color='red'>CRITICAL</font>: Refactor {len(very_complex_funcs)} extremely complex functions (CC > 20):")
-        for func in very_complex_funcs[:3]:
-            suggestions.append(f"  - {func.name} (CC: {func.cyclomatic_complexity}, LOC: {func.length}) in {os.path.basename(func.filename)}")
+    if very_complex_count:
+        append(f"• <font color='red'>CRITICAL</font>: Refactor {very_complex_count} extremely complex functions (CC > 20):")
+        for name, cc, length, file in acc.very_complex_funcs:
+            append(f"  - {name} (CC: {cc}, LOC: {length}) in {file}")
     
-    if complex_funcs:
-        suggestions.append(f"• <font color='orange'>HIGH</font>: Address {len(complex_funcs)} complex functions (CC > 10):")
-        suggestions.append("  - Break down into smaller functions with single responsibilities")
-        suggestions.append("  - Consider using strategy pattern or state pattern for complex conditional logic")
+    if complex_count:
+        append(f"• <font color='orange'>HIGH</font>: Address {complex_count} complex functions (CC > 10):")
+        append("  - Break down into smaller functions with single responsibilities")
+        append("  - Consider using strategy pattern or state pattern for complex conditional logic")
     
-    if long_funcs:
-        suggestions.append(f"• <font color='orange'>HIGH</font>: Refactor {len(long_funcs)} long functions (LOC > 50):")
-        suggestions.append("  - Extract helper functions for discrete operations")
-        suggestions.append("  - Consider if function is violating the Single Responsibility Principle")
+    if long_count:
+        append(f"• <font color='orange'>HIGH</font>: Refactor {long_count} long functions (LOC > 50):")
+        append("  - Extract helper functions for discrete operations")
+        append("  - Consider if function is violating the Single Responsibility Principle")
     
-    suggestions.extend([
-        "<br/>",
-        "<b>General Best Practices:</b>",
-        "• Add comments to complex algorithms for better maintainability",
-        "• Consider adding unit tests for critical functions, especially those with high complexity",
-        "• Implement code review processes to catch complexity issues early",
-        "• Use static analysis tools in your CI/CD pipeline",
-        "• Consider using guard clauses and early returns to reduce nesting",
-        "• Extract complex conditions into well-named helper functions or variables"
-    ])
-    
-    # Add technology-specific suggestions
-    suggestions.extend([
-        "<br/>",
-        "<b>Technology-Specific Suggestions:</b>",
-        "• For React components: Consider splitting large components into smaller presentational and container components",
-        "• For JavaScript: Use modern ES6+ features like arrow functions, destructuring, and async/await to simplify code",
-        "• For Python: Use list comprehensions and built-in functions where appropriate to reduce complexity",
-        "• For Java/C++: Consider using design patterns to manage complexity in large codebases"
-    ])
+    # General best practices and technology-specific suggestions never change
+    append(_STATIC_BEST_PRACTICES)
     
-    return "<br/>".join(suggestions)
+    return "<br/>".join(parts)
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Usage: python report.py <project_path>")
         sys.exit(1)
-    generate_report(sys.argv[1])
\ No newline at end of file
+    generate_report(sys.argv[1]).result()
\ No newline at end of file